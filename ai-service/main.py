@@ -1,20 +1,64 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable, AsyncIterator
+from collections import Counter
+from contextlib import asynccontextmanager
+from cachetools import LRUCache, TTLCache
 import asyncio
+import atexit
+import codecs
+import hashlib
 import logging
+import logging.handlers
+import msgspec
+import orjson
 import os
-from datetime import datetime
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+import queue
+import re
+import string
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Configure logging; records are formatted and written by a background thread
+# so neither formatting nor slow handlers run on the event loop
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records untouched, leaving formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record needs no pickling
+        return record
+
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.getLogger().addHandler(DeferredQueueHandler(log_queue))
+logging.getLogger().setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up models and start the batching workers for each worker process"""
+    await run_in_threadpool(warm_up_models)
+    image_batcher.start()
+    prediction_batcher.start()
+    yield
+    await image_batcher.stop()
+    await prediction_batcher.stop()
+
 app = FastAPI(
     title="PyGoRP AI Service",
     description="AI/ML service for PyGoRP application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -26,47 +70,185 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Pydantic models
+# Pydantic models, used only for the OpenAPI schema; routes encode their own responses
 class TextAnalysisRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     text: str
     analysis_type: str = "sentiment"  # sentiment, keywords, summary
-    options: Optional[Dict[str, Any]] = None
+    options: Any = None
 
 class ImageAnalysisRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     image_url: Optional[str] = None
     image_data: Optional[str] = None  # base64 encoded
     analysis_type: str = "classification"
 
 class MLModelRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid", protected_namespaces=())  # Allow the model_name field
+
     model_name: str
     input_data: Dict[str, Any]
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Any = None
 
 class AnalysisResponse(BaseModel):
     request_id: str
     status: str
-    result: Optional[Dict[str, Any]] = None
+    result: Any = None
     confidence: Optional[float] = None
     processing_time: Optional[float] = None
     error: Optional[str] = None
 
-# Mock AI functions (replace with actual ML models)
-async def analyze_sentiment(text: str) -> Dict[str, Any]:
-    """Mock sentiment analysis"""
-    await asyncio.sleep(0.5)  # Simulate processing time
+# msgspec structs decode and encode request bodies in one pass;
+# the Pydantic models above are kept to document the API schema
+class TextAnalysisPayload(msgspec.Struct, forbid_unknown_fields=True):
+    text: str
+    analysis_type: str = "sentiment"
+    options: Any = None
+
+class ImageAnalysisPayload(msgspec.Struct, forbid_unknown_fields=True):
+    image_url: Optional[str] = None
+    image_data: Optional[str] = None
+    analysis_type: str = "classification"
+
+class MLModelPayload(msgspec.Struct, forbid_unknown_fields=True):
+    model_name: str
+    input_data: Dict[str, Any]
+    parameters: Any = None
+
+class AnalysisResult(msgspec.Struct, omit_defaults=True):
+    request_id: str
+    status: str
+    result: Any = None
+    confidence: Optional[float] = None
+    processing_time: Optional[float] = None
+    error: Optional[str] = None
 
-    # Simple mock logic
-    positive_words = ["good", "great", "excellent", "amazing", "wonderful", "love"]
-    negative_words = ["bad", "terrible", "awful", "hate", "worst", "poor"]
+_text_decoder = msgspec.json.Decoder(TextAnalysisPayload)
+_image_decoder = msgspec.json.Decoder(ImageAnalysisPayload)
+_ml_decoder = msgspec.json.Decoder(MLModelPayload)
+_result_encoder = msgspec.json.Encoder()
+
+# msgspec reports errors as text; these patterns (pinned by test_main.py) map
+# them onto the error types and messages FastAPI's Pydantic validation produces
+_ERROR_PATH_RE = re.compile(r" - at `\$([^`]*)`$")
+_ERROR_PATH_PART_RE = re.compile(r"\.(\w+)|\[(\d+)\]")
+_MISSING_FIELD_RE = re.compile(r"^Object missing required field `(\w+)`$")
+_UNKNOWN_FIELD_RE = re.compile(r"^Object contains unknown field `(\w+)`$")
+_EXPECTED_TYPE_RE = re.compile(r"^Expected `(\w+)")
+_BYTE_OFFSET_RE = re.compile(r"\(byte (\d+)\)$")
+_TYPE_ERRORS = {
+    "str": ("string_type", "Input should be a valid string"),
+    "int": ("int_type", "Input should be a valid integer"),
+    "float": ("float_type", "Input should be a valid number"),
+    "bool": ("bool_type", "Input should be a valid boolean"),
+    "array": ("list_type", "Input should be a valid list"),
+    "object": ("dict_type", "Input should be a valid dictionary"),
+}
+
+def _value_at(document: Any, path: List[Any]) -> Any:
+    for part in path:
+        try:
+            document = document[part]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return document
+
+def validation_error(e: msgspec.DecodeError, body: bytes) -> RequestValidationError:
+    """Report a msgspec decode failure the way FastAPI reports Pydantic errors"""
+    message = str(e)
+    if not body:
+        return RequestValidationError([{"type": "missing", "loc": ["body"], "msg": "Field required", "input": None}])
+    if not isinstance(e, msgspec.ValidationError):
+        offset = _BYTE_OFFSET_RE.search(message)
+        return RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ["body", int(offset.group(1)) if offset else len(body)],
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": message},
+        }])
+
+    path: List[Any] = []
+    at = _ERROR_PATH_RE.search(message)
+    if at:
+        message = message[:at.start()]
+        path = [name or int(index) for name, index in _ERROR_PATH_PART_RE.findall(at.group(1))]
+    # The body is valid JSON here, so it can be walked to report the offending input
+    value = _value_at(msgspec.json.decode(body), path)
+
+    missing = _MISSING_FIELD_RE.match(message)
+    unknown = _UNKNOWN_FIELD_RE.match(message)
+    expected = _EXPECTED_TYPE_RE.match(message)
+    if missing:
+        error = {"type": "missing", "loc": path + [missing.group(1)], "msg": "Field required", "input": value}
+    elif unknown:
+        field = unknown.group(1)
+        error = {"type": "extra_forbidden", "loc": path + [field], "msg": "Extra inputs are not permitted", "input": value[field]}
+    elif expected and expected.group(1) == "object" and not path:
+        error = {
+            "type": "model_attributes_type",
+            "loc": path,
+            "msg": "Input should be a valid dictionary or object to extract fields from",
+            "input": value,
+        }
+    elif expected and expected.group(1) in _TYPE_ERRORS:
+        error_type, msg = _TYPE_ERRORS[expected.group(1)]
+        error = {"type": error_type, "loc": path, "msg": msg, "input": value}
+    else:
+        error = {"type": "value_error", "loc": path, "msg": message, "input": value}
+    error["loc"] = ["body"] + error["loc"]
+    return RequestValidationError([error])
+
+async def decode_body(request: Request, decoder: msgspec.json.Decoder) -> Any:
+    """Decode a JSON request body straight into a msgspec struct"""
+    body = await request.body()
+    try:
+        return decoder.decode(body)
+    except msgspec.DecodeError as e:
+        raise validation_error(e, body)
+
+def encode_result(result: AnalysisResult) -> Response:
+    """Encode an analysis result without going through FastAPI's serializer"""
+    return Response(content=_result_encoder.encode(result), media_type="application/json")
 
-    text_lower = text.lower()
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
+def json_body(model: type) -> Dict[str, Any]:
+    """OpenAPI request body for routes that decode their own JSON"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
 
-    if positive_count > negative_count:
+# Mock AI functions (replace with actual ML models)
+# Lexicons and the tokenizer are built once at import time
+POSITIVE_WORDS = frozenset(["good", "great", "excellent", "amazing", "wonderful", "love"])
+NEGATIVE_WORDS = frozenset(["bad", "terrible", "awful", "hate", "worst", "poor"])
+LEXICON_WORDS = POSITIVE_WORDS | NEGATIVE_WORDS
+_TOKEN_RE = re.compile(r"[a-z]+")  # Ignores punctuation, unlike str.split
+
+def tally_sentiment(text: str) -> Tuple[int, Counter]:
+    """Count tokens and lexicon hits in lowercased text"""
+    tokens = _TOKEN_RE.findall(text)
+    token_counts = Counter(tokens)
+    lexicon_counts = Counter({word: token_counts[word] for word in LEXICON_WORDS if word in token_counts})
+    return len(tokens), lexicon_counts
+
+def score_sentiment(total: int, lexicon_counts: Counter) -> Dict[str, Any]:
+    """Score sentiment from a token total and lexicon hit counts"""
+    total = total or 1
+    positive_count = sum(lexicon_counts[word] for word in POSITIVE_WORDS)
+    negative_count = sum(lexicon_counts[word] for word in NEGATIVE_WORDS)
+    positive_fraction = positive_count / total
+    negative_fraction = negative_count / total
+    score = positive_count - negative_count
+
+    if score > 0:
         sentiment = "positive"
         confidence = min(0.9, 0.5 + (positive_count * 0.1))
-    elif negative_count > positive_count:
+    elif score < 0:
         sentiment = "negative"
         confidence = min(0.9, 0.5 + (negative_count * 0.1))
     else:
@@ -77,221 +259,567 @@ async def analyze_sentiment(text: str) -> Dict[str, Any]:
         "sentiment": sentiment,
         "confidence": confidence,
         "scores": {
-            "positive": positive_count / max(len(text.split()), 1),
-            "negative": negative_count / max(len(text.split()), 1),
-            "neutral": 1 - (positive_count + negative_count) / max(len(text.split()), 1)
+            "positive": positive_fraction,
+            "negative": negative_fraction,
+            "neutral": 1 - positive_fraction - negative_fraction
         }
     }
 
-async def extract_keywords(text: str, max_keywords: int = 5) -> Dict[str, Any]:
-    """Mock keyword extraction"""
-    await asyncio.sleep(0.3)
-
-    # Simple mock keyword extraction
-    words = text.lower().split()
-    word_freq = {}
+def analyze_sentiment(text: str) -> Dict[str, Any]:
+    """Mock sentiment analysis"""
+    # Simple mock logic: tokenize and count in C
+    return score_sentiment(*tally_sentiment(text.lower()))
 
-    for word in words:
-        if len(word) > 3:  # Only consider words longer than 3 characters
-            word_freq[word] = word_freq.get(word, 0) + 1
+def count_keywords(text: str) -> Counter:
+    """Count candidate keywords, only considering words longer than 3 characters"""
+    return Counter(word for word in text.lower().split() if len(word) > 3)
 
-    keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:max_keywords]
+def rank_keywords(word_counts: Counter, max_keywords: int = 5) -> Dict[str, Any]:
+    """Pick the most frequent keywords"""
+    keywords = word_counts.most_common(max_keywords)
 
     return {
         "keywords": [word for word, freq in keywords],
         "frequencies": {word: freq for word, freq in keywords}
     }
 
-async def generate_summary(text: str, max_length: int = 100) -> Dict[str, Any]:
+# Keyed on a digest so memoized entries never keep whole documents alive;
+# extract_keywords runs in the threadpool, hence the lock
+keyword_memo: LRUCache = LRUCache(maxsize=4096)
+keyword_memo_lock = threading.Lock()
+
+def text_digest(text: str) -> bytes:
+    """Compact digest identifying a text in caches"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+def extract_keywords(text: str, max_keywords: int = 5, text_hash: Optional[bytes] = None) -> Dict[str, Any]:
+    """Mock keyword extraction (memoized, callers must not mutate the result)"""
+    # Callers that already digested the text pass text_hash to avoid hashing it twice
+    key = (text_hash or text_digest(text), max_keywords)
+    with keyword_memo_lock:
+        result = keyword_memo.get(key)
+    if result is None:
+        result = rank_keywords(count_keywords(text), max_keywords)
+        with keyword_memo_lock:
+            keyword_memo[key] = result
+    return result
+
+def generate_summary(text: str, max_length: int = 100) -> Dict[str, Any]:
     """Mock text summarization"""
-    await asyncio.sleep(0.8)
-
     words = text.split()
-    if len(words) <= max_length:
+    original_length = len(words)
+    if original_length <= max_length:
         summary = text
+        summary_length = original_length
     else:
         summary = " ".join(words[:max_length]) + "..."
+        summary_length = max_length
 
     return {
         "summary": summary,
-        "original_length": len(words),
-        "summary_length": len(summary.split()),
-        "compression_ratio": len(summary.split()) / len(words)
+        "original_length": original_length,
+        "summary_length": summary_length,
+        "compression_ratio": summary_length / (original_length or 1)
+    }
+
+def warm_up_models() -> None:
+    """Load models once per process so the first request does not pay for it"""
+    # Mock models have no weights to load, so exercise each analyzer once instead
+    for analyzer in (analyze_sentiment, extract_keywords, generate_summary):
+        analyzer("warm up")
+    logger.info("Models warmed up in worker %d", os.getpid())
+
+# Longest partial token carried between streamed chunks; longer runs are split
+MAX_STREAM_TOKEN_LENGTH = 1024
+
+def letter_boundary(buffer: str) -> int:
+    """Index just past the last character outside [a-z]"""
+    return len(buffer.rstrip(string.ascii_lowercase))
+
+def whitespace_boundary(buffer: str) -> int:
+    """Index just past the last whitespace character"""
+    if not buffer or buffer[-1].isspace():
+        return len(buffer)
+    return len(buffer) - len(buffer.rsplit(None, 1)[-1])
+
+class StreamingTokenizer:
+    """Splits a streamed body into lowercased segments that end on a token boundary.
+
+    Only the trailing partial token is buffered between chunks, capped at
+    MAX_STREAM_TOKEN_LENGTH, so the tokenizer's own memory is bounded by the
+    chunk size. Each complete segment is handed to consume.
+    """
+
+    def __init__(self, consume: Callable[[str], None], boundary: Callable[[str], int]):
+        self._consume = consume
+        self._boundary = boundary
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._tail = ""
+
+    def feed(self, chunk: bytes) -> None:
+        buffer = self._tail + self._decoder.decode(chunk).lower()
+        cut = self._boundary(buffer)
+        if len(buffer) - cut > MAX_STREAM_TOKEN_LENGTH:
+            cut = len(buffer)
+        self._tail = buffer[cut:]
+        self._consume(buffer[:cut])
+
+    def finish(self) -> None:
+        buffer = self._tail + self._decoder.decode(b"", final=True).lower()
+        self._tail = ""
+        self._consume(buffer)
+
+class SentimentTally:
+    """Running token total and lexicon counts, independent of the body size"""
+
+    def __init__(self):
+        self.total = 0
+        self.lexicon_counts: Counter = Counter()
+
+    def add(self, segment: str) -> None:
+        total, lexicon_counts = tally_sentiment(segment)
+        self.total += total
+        self.lexicon_counts.update(lexicon_counts)
+
+async def stream_text_analysis(chunks: AsyncIterator[bytes], analysis_type: str) -> Dict[str, Any]:
+    """Run a token-based analysis incrementally over a streamed body"""
+    if analysis_type == "sentiment":
+        tally = SentimentTally()
+        tokenizer = StreamingTokenizer(tally.add, letter_boundary)
+    elif analysis_type == "keywords":
+        # Keyword counts grow with the number of distinct words in the body
+        word_counts: Counter = Counter()
+        tokenizer = StreamingTokenizer(lambda segment: word_counts.update(count_keywords(segment)), whitespace_boundary)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported analysis type for streaming: {analysis_type}")
+
+    # Tokenizing is CPU work, so keep it off the event loop like the JSON path
+    async for chunk in chunks:
+        await run_in_threadpool(tokenizer.feed, chunk)
+    await run_in_threadpool(tokenizer.finish)
+
+    if analysis_type == "sentiment":
+        await asyncio.sleep(0.5)  # Simulate processing time
+        return score_sentiment(tally.total, tally.lexicon_counts)
+    else:
+        await asyncio.sleep(0.3)
+        return rank_keywords(word_counts)
+
+async def run_text_analysis(text: str, analysis_type: str, text_hash: Optional[bytes] = None) -> Dict[str, Any]:
+    """Dispatch text to the requested analysis, keeping CPU work off the event loop"""
+    if analysis_type == "sentiment":
+        await asyncio.sleep(0.5)  # Simulate processing time
+        return await run_in_threadpool(analyze_sentiment, text)
+    elif analysis_type == "keywords":
+        await asyncio.sleep(0.3)
+        return await run_in_threadpool(extract_keywords, text, text_hash=text_hash)
+    elif analysis_type == "summary":
+        await asyncio.sleep(0.8)
+        return await run_in_threadpool(generate_summary, text)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported analysis type: {analysis_type}")
+
+# Text analysis results are pure functions of their input, so cache them
+text_cache: TTLCache = TTLCache(
+    maxsize=int(os.getenv("TEXT_CACHE_SIZE", 10_000)),
+    ttl=int(os.getenv("TEXT_CACHE_TTL", 600)),
+)
+# Identical requests already being computed, keyed like the cache
+text_inflight: Dict[bytes, asyncio.Future] = {}
+
+def text_cache_key(digest: bytes, analysis_type: str) -> bytes:
+    """Build a compact cache key from the analysis type and the text's digest"""
+    return analysis_type.encode() + b":" + digest
+
+async def _analyze_and_cache(key: bytes, digest: bytes, text: str, analysis_type: str) -> Dict[str, Any]:
+    result = await run_text_analysis(text, analysis_type, digest)
+    text_cache[key] = result
+    return result
+
+async def cached_text_analysis(text: str, analysis_type: str) -> Dict[str, Any]:
+    """Run a text analysis, reusing cached or in-flight results for repeated inputs"""
+    digest = text_digest(text)
+    key = text_cache_key(digest, analysis_type)
+    result = text_cache.get(key)
+    if result is not None:
+        return result
+
+    # Concurrent misses on the same key all await the first request's computation
+    future = text_inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(_analyze_and_cache(key, digest, text, analysis_type))
+        text_inflight[key] = future
+        future.add_done_callback(lambda _: text_inflight.pop(key, None))
+
+    # Shield so one caller disconnecting does not cancel the work for the others
+    return await asyncio.shield(future)
+
+# Mock model outputs are constant, so build them once instead of per request
+IMAGE_CLASSIFICATION_RESULT = {
+    "predictions": [
+        {"label": "cat", "confidence": 0.85},
+        {"label": "animal", "confidence": 0.92},
+        {"label": "pet", "confidence": 0.78}
+    ],
+    "dominant_color": "#8B4513",
+    "image_quality": "high"
+}
+PREDICTION_RESULTS = {
+    "regression": {
+        "prediction": 42.5,
+        "feature_importance": {
+            "feature1": 0.3,
+            "feature2": 0.25,
+            "feature3": 0.45
+        }
+    },
+    "classification": {
+        "prediction": "class_A",
+        "probabilities": {
+            "class_A": 0.7,
+            "class_B": 0.2,
+            "class_C": 0.1
+        }
     }
+}
+
+async def classify_images(requests: List[ImageAnalysisPayload]) -> List[Any]:
+    """Mock batched image classification"""
+    await asyncio.sleep(1.0)  # One forward pass for the whole batch
+
+    results = []
+    for request in requests:
+        if request.analysis_type == "classification":
+            results.append(IMAGE_CLASSIFICATION_RESULT)
+        else:
+            results.append(HTTPException(status_code=400, detail=f"Unsupported analysis type: {request.analysis_type}"))
+    return results
+
+async def run_predictions(requests: List[MLModelPayload]) -> List[Any]:
+    """Mock batched ML prediction"""
+    await asyncio.sleep(0.7)  # One forward pass for the whole batch
+
+    # Simulate different model behaviors
+    results = []
+    for request in requests:
+        result = PREDICTION_RESULTS.get(request.model_name)
+        if result is not None:
+            results.append(result)
+        else:
+            results.append(HTTPException(status_code=400, detail=f"Unknown model: {request.model_name}"))
+    return results
+
+# Dynamic batching
+class DynamicBatcher:
+    """Groups concurrent requests into a single model call.
+
+    A batch is flushed once it holds max_batch_size requests or max_delay
+    seconds after its first request. process_batch returns one result per
+    payload; an Exception in the results is raised to that caller only.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 32,
+        max_delay: float = 0.05,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._batch: List[tuple] = []
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the worker on the running loop unless one is already serving it"""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._worker.get_loop() is loop:
+            return
+        if self._worker is not None and self._worker.get_loop() is loop:
+            self._fail_pending("Batch worker exited")
+        else:
+            # Queues bind to the loop that first uses them
+            self.queue = asyncio.Queue()
+            self._batch = []
+        self._worker = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._fail_pending("Batch worker stopped")
+
+    async def submit(self, payload: Any) -> Any:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((payload, future))
+        return await future
+
+    def _fail_pending(self, reason: str) -> None:
+        """Fail the batch in progress and everything still queued"""
+        pending, self._batch = self._batch, []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+
+    async def _collect(self) -> List[tuple]:
+        loop = asyncio.get_running_loop()
+        self._batch = batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_delay
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                results = await self.process_batch([payload for payload, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Expected {len(batch)} results, got {len(results)}")
+            except Exception as e:
+                logger.error("Error processing batch of %d: %s", len(batch), e)
+                # Give each caller its own exception so tracebacks don't collide
+                results = [RuntimeError(f"Batch processing failed: {e}") for _ in batch]
+
+            for (_, future), result in zip(batch, results):
+                if future.done():  # Caller went away
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self._batch = []
+
+image_batcher = DynamicBatcher(
+    classify_images,
+    max_batch_size=int(os.getenv("MAX_BATCH_SIZE", 32)),
+    max_delay=int(os.getenv("MAX_BATCH_DELAY_MS", 50)) / 1000,
+)
+prediction_batcher = DynamicBatcher(
+    run_predictions,
+    max_batch_size=int(os.getenv("MAX_BATCH_SIZE", 32)),
+    max_delay=int(os.getenv("MAX_BATCH_DELAY_MS", 50)) / 1000,
+)
 
 # API Endpoints
+# Probes don't need sub-second timestamps, so the health payload is rebuilt at most once a second
+_health_payload = (0, b"")
+
 @app.get("/health")
+@app.head("/health", include_in_schema=False)  # Separate route so operation ids stay unique
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "pygorp-ai-service",
-        "timestamp": datetime.utcnow().isoformat()
-    }
-
-@app.post("/api/v1/analyze/text", response_model=AnalysisResponse)
-async def analyze_text(request: TextAnalysisRequest, background_tasks: BackgroundTasks):
+    global _health_payload
+    now = int(time.time())
+    if now != _health_payload[0]:
+        _health_payload = (now, orjson.dumps({
+            "status": "healthy",
+            "service": "pygorp-ai-service",
+            "timestamp": datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)  # Keep the offset-free format
+        }))
+    return Response(content=_health_payload[1], media_type="application/json")
+
+@app.post("/api/v1/analyze/text", response_model=AnalysisResponse, openapi_extra=json_body(TextAnalysisRequest))
+async def analyze_text(http_request: Request):
     """Analyze text using various AI models"""
-    request_id = f"text_{datetime.utcnow().timestamp()}"
-    start_time = datetime.utcnow()
+    request = await decode_body(http_request, _text_decoder)
+    request_id = f"text_{uuid.uuid4().hex}"
+    start_ns = time.perf_counter_ns()
 
     try:
-        if request.analysis_type == "sentiment":
-            result = await analyze_sentiment(request.text)
-        elif request.analysis_type == "keywords":
-            result = await extract_keywords(request.text)
-        elif request.analysis_type == "summary":
-            result = await generate_summary(request.text)
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported analysis type: {request.analysis_type}")
+        result = await cached_text_analysis(request.text, request.analysis_type)
+
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
+
+        return encode_result(AnalysisResult(
+            request_id=request_id,
+            status="completed",
+            result=result,
+            confidence=result.get("confidence"),
+            processing_time=processing_time
+        ))
+
+    except Exception as e:
+        logger.error("Error processing text analysis: %s", e)
+        return encode_result(AnalysisResult(
+            request_id=request_id,
+            status="failed",
+            error=str(e)
+        ))
+
+@app.post(
+    "/api/v1/analyze/text/stream",
+    response_model=AnalysisResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/plain": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def analyze_text_stream(http_request: Request, analysis_type: str = "sentiment"):
+    """Analyze a streamed plain-text body without loading the whole document"""
+    request_id = f"text_{uuid.uuid4().hex}"
+    start_ns = time.perf_counter_ns()
 
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+    try:
+        result = await stream_text_analysis(http_request.stream(), analysis_type)
+
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
-        return AnalysisResponse(
+        return encode_result(AnalysisResult(
             request_id=request_id,
             status="completed",
             result=result,
             confidence=result.get("confidence"),
             processing_time=processing_time
-        )
+        ))
 
     except Exception as e:
-        logger.error(f"Error processing text analysis: {str(e)}")
-        return AnalysisResponse(
+        logger.error("Error processing streamed text analysis: %s", e)
+        return encode_result(AnalysisResult(
             request_id=request_id,
             status="failed",
             error=str(e)
-        )
+        ))
 
-@app.post("/api/v1/analyze/image", response_model=AnalysisResponse)
-async def analyze_image(request: ImageAnalysisRequest):
+@app.post("/api/v1/analyze/image", response_model=AnalysisResponse, openapi_extra=json_body(ImageAnalysisRequest))
+async def analyze_image(http_request: Request):
     """Analyze images using computer vision models"""
-    request_id = f"image_{datetime.utcnow().timestamp()}"
-    start_time = datetime.utcnow()
+    request = await decode_body(http_request, _image_decoder)
+    request_id = f"image_{uuid.uuid4().hex}"
+    start_ns = time.perf_counter_ns()
 
     try:
-        # Mock image analysis
-        await asyncio.sleep(1.0)
-
-        if request.analysis_type == "classification":
-            result = {
-                "predictions": [
-                    {"label": "cat", "confidence": 0.85},
-                    {"label": "animal", "confidence": 0.92},
-                    {"label": "pet", "confidence": 0.78}
-                ],
-                "dominant_color": "#8B4513",
-                "image_quality": "high"
-            }
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported analysis type: {request.analysis_type}")
+        result = await image_batcher.submit(request)
 
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
-        return AnalysisResponse(
+        return encode_result(AnalysisResult(
             request_id=request_id,
             status="completed",
             result=result,
             confidence=0.85,
             processing_time=processing_time
-        )
+        ))
 
     except Exception as e:
-        logger.error(f"Error processing image analysis: {str(e)}")
-        return AnalysisResponse(
+        logger.error("Error processing image analysis: %s", e)
+        return encode_result(AnalysisResult(
             request_id=request_id,
             status="failed",
             error=str(e)
-        )
+        ))
 
-@app.post("/api/v1/ml/predict", response_model=AnalysisResponse)
-async def ml_prediction(request: MLModelRequest):
+@app.post("/api/v1/ml/predict", response_model=AnalysisResponse, openapi_extra=json_body(MLModelRequest))
+async def ml_prediction(http_request: Request):
     """Make predictions using trained ML models"""
-    request_id = f"ml_{datetime.utcnow().timestamp()}"
-    start_time = datetime.utcnow()
+    request = await decode_body(http_request, _ml_decoder)
+    request_id = f"ml_{uuid.uuid4().hex}"
+    start_ns = time.perf_counter_ns()
 
     try:
-        # Mock ML prediction
-        await asyncio.sleep(0.7)
-
-        # Simulate different model behaviors
-        if request.model_name == "regression":
-            result = {
-                "prediction": 42.5,
-                "feature_importance": {
-                    "feature1": 0.3,
-                    "feature2": 0.25,
-                    "feature3": 0.45
-                }
-            }
-        elif request.model_name == "classification":
-            result = {
-                "prediction": "class_A",
-                "probabilities": {
-                    "class_A": 0.7,
-                    "class_B": 0.2,
-                    "class_C": 0.1
-                }
-            }
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown model: {request.model_name}")
+        result = await prediction_batcher.submit(request)
 
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
-        return AnalysisResponse(
+        return encode_result(AnalysisResult(
             request_id=request_id,
             status="completed",
             result=result,
             confidence=0.8,
             processing_time=processing_time
-        )
+        ))
 
     except Exception as e:
-        logger.error(f"Error processing ML prediction: {str(e)}")
-        return AnalysisResponse(
+        logger.error("Error processing ML prediction: %s", e)
+        return encode_result(AnalysisResult(
             request_id=request_id,
             status="failed",
             error=str(e)
-        )
+        ))
+
+# Static payloads are serialized once at import time
+MODELS = {
+    "models": [
+        {
+            "name": "sentiment_analyzer",
+            "type": "text_analysis",
+            "description": "Analyzes sentiment in text"
+        },
+        {
+            "name": "keyword_extractor",
+            "type": "text_analysis",
+            "description": "Extracts keywords from text"
+        },
+        {
+            "name": "image_classifier",
+            "type": "computer_vision",
+            "description": "Classifies images"
+        },
+        {
+            "name": "regression_model",
+            "type": "regression",
+            "description": "Predicts continuous values"
+        },
+        {
+            "name": "classification_model",
+            "type": "classification",
+            "description": "Predicts categorical values"
+        }
+    ]
+}
+_MODELS_JSON = orjson.dumps(MODELS)
+_MODELS_HEADERS = {
+    "ETag": f'"{hashlib.blake2b(_MODELS_JSON, digest_size=8).hexdigest()}"',
+    "Cache-Control": "public, max-age=300",
+}
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header covers the given ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
 
 @app.get("/api/v1/models")
-async def list_models():
+@app.head("/api/v1/models", include_in_schema=False)  # Separate route so operation ids stay unique
+async def list_models(request: Request):
     """List available ML models"""
-    return {
-        "models": [
-            {
-                "name": "sentiment_analyzer",
-                "type": "text_analysis",
-                "description": "Analyzes sentiment in text"
-            },
-            {
-                "name": "keyword_extractor",
-                "type": "text_analysis",
-                "description": "Extracts keywords from text"
-            },
-            {
-                "name": "image_classifier",
-                "type": "computer_vision",
-                "description": "Classifies images"
-            },
-            {
-                "name": "regression_model",
-                "type": "regression",
-                "description": "Predicts continuous values"
-            },
-            {
-                "name": "classification_model",
-                "type": "classification",
-                "description": "Predicts categorical values"
-            }
-        ]
-    }
+    if etag_matches(request, _MODELS_HEADERS["ETag"]):
+        return Response(status_code=304, headers=_MODELS_HEADERS)
+    return Response(content=_MODELS_JSON, media_type="application/json", headers=_MODELS_HEADERS)
 
 if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
-
-    logger.info(f"Starting PyGoRP AI Service on {host}:{port}")
-    uvicorn.run(app, host=host, port=port)
+    workers = int(os.getenv("WORKERS", os.cpu_count() or 1))
+
+    logger.info("Starting PyGoRP AI Service on %s:%d with %d workers", host, port, workers)
+    # Pass the app as an import string so uvicorn can spawn and supervise worker processes
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+    )
@@ -0,0 +1,62 @@
+"""Request validation must keep FastAPI's error format.
+
+Bodies are decoded with msgspec and its error messages are translated into
+Pydantic-style errors. Comparing against a plain FastAPI app that validates the
+same Pydantic models pins those messages, so a msgspec upgrade that rewords them
+fails here instead of silently changing the API.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+import main
+
+reference = FastAPI()
+
+@reference.post("/api/v1/analyze/text")
+def reference_text(request: main.TextAnalysisRequest):
+    return {}
+
+@reference.post("/api/v1/analyze/image")
+def reference_image(request: main.ImageAnalysisRequest):
+    return {}
+
+@reference.post("/api/v1/ml/predict")
+def reference_ml(request: main.MLModelRequest):
+    return {}
+
+client = TestClient(main.app)
+reference_client = TestClient(reference)
+
+INVALID_BODIES = [
+    ("/api/v1/analyze/text", b""),
+    ("/api/v1/analyze/text", b"{}"),
+    ("/api/v1/analyze/text", b"[]"),
+    ("/api/v1/analyze/text", b'"text"'),
+    ("/api/v1/analyze/text", b'{"text": 1}'),
+    ("/api/v1/analyze/text", b'{"text": "a", "analysis_type": null}'),
+    ("/api/v1/analyze/text", b'{"text": "a", "unknown": 1}'),
+    ("/api/v1/analyze/text", b'{"text": '),
+    ("/api/v1/analyze/text", b'{"text": "a",}'),
+    ("/api/v1/analyze/image", b'{"image_url": 3}'),
+    ("/api/v1/analyze/image", b'{"analysis_type": false}'),
+    ("/api/v1/ml/predict", b'{"input_data": {}}'),
+    ("/api/v1/ml/predict", b'{"model_name": 1.5, "input_data": {}}'),
+    ("/api/v1/ml/predict", b'{"model_name": "x", "input_data": []}'),
+    ("/api/v1/ml/predict", b'{"model_name": "x", "input_data": {}, "extra": [1]}'),
+]
+
+def post(test_client: TestClient, path: str, body: bytes):
+    return test_client.post(path, content=body, headers={"Content-Type": "application/json"})
+
+def without_ctx(detail):
+    # The JSON parser's own wording for malformed input is not part of the contract
+    return [{key: value for key, value in error.items() if key != "ctx"} for error in detail]
+
+@pytest.mark.parametrize("path,body", INVALID_BODIES)
+def test_validation_errors_match_fastapi(path, body):
+    response = post(client, path, body)
+    expected = post(reference_client, path, body)
+
+    assert response.status_code == expected.status_code == 422
+    assert without_ctx(response.json()["detail"]) == without_ctx(expected.json()["detail"])